@@ -0,0 +1,136 @@
+import asyncio
+import json
+import os
+
+# Hard cap on LLM round trips per request; after it the model must answer.
+MAX_ITERATIONS = int(os.getenv("AGENT_MAX_ITERATIONS", "4"))
+
+# Tokens of tool output sent back to the model per turn, shared by that
+# turn's tool calls. Rough 4 chars/token estimate, no tokenizer needed.
+TOOL_TOKEN_BUDGET = int(os.getenv("AGENT_TOOL_TOKEN_BUDGET", "3000"))
+CHARS_PER_TOKEN = 4
+
+TRUNCATION_MARKER = " …[truncated]"
+
+
+async def run_agent_loop(create_completion, messages, tool_handlers,
+                         max_iterations=MAX_ITERATIONS, token_budget=TOOL_TOKEN_BUDGET):
+    """Run the tool-calling loop and return the model's final message.
+
+    create_completion(messages, tool_choice) is a blocking call returning a
+    chat completion; it runs in a worker thread. tool_choice is "auto" inside
+    the loop and "none" for the forced final answer. tool_handlers maps tool
+    names to async callables taking the tool arguments as keywords.
+    """
+    seen_calls = {}  # (name, normalized args) -> tool_call_id that answered it
+
+    for _ in range(max_iterations):
+        completion = await asyncio.to_thread(create_completion, messages, "auto")
+        message = completion.choices[0].message
+        messages.append(message)
+
+        # Exit loop if no tool call
+        if not message.tool_calls:
+            return message
+
+        # Repeated calls (same tool, same normalized args) are not re-run.
+        pending = {}
+        for tool in message.tool_calls:
+            key = call_key(tool)
+            if key not in seen_calls:
+                seen_calls[key] = tool.id
+                pending[tool.id] = run_tool(tool_handlers, tool)
+        results = dict(zip(pending, await asyncio.gather(*pending.values())))
+
+        # Split this turn's budget across the calls that actually ran.
+        per_call_tokens = token_budget // max(len(results), 1)
+        for tool in message.tool_calls:
+            if tool.id in results:
+                content = compact_tool_result(results[tool.id], per_call_tokens)
+            else:
+                content = json.dumps(
+                    f"Duplicate call: already answered by tool call {seen_calls[call_key(tool)]}. "
+                    "Do not call it again with the same arguments."
+                )
+            # Append tool output for next AI step
+            messages.append({
+                "role": "tool",
+                "tool_call_id": tool.id,
+                "content": content
+            })
+
+    # Iteration cap reached: one last call with tool_choice="none" forces an answer.
+    print(f"⚠️ Agent loop hit max_iterations={max_iterations}, forcing final answer")
+    completion = await asyncio.to_thread(create_completion, messages, "none")
+    message = completion.choices[0].message
+    messages.append(message)
+    return message
+
+
+async def run_tool(tool_handlers, tool):
+    function_name = tool.function.name
+    try:
+        function_args = json.loads(tool.function.arguments)
+        handler = tool_handlers.get(function_name)
+        if handler is None:
+            return f"Unknown tool: {function_name}"
+        return await handler(**function_args)
+    except Exception as e:
+        print(f"⚠️ Error running {function_name}: {e}")
+        return f"Error running {function_name}: {e}"
+
+
+def call_key(tool):
+    try:
+        args = json.loads(tool.function.arguments)
+    except ValueError:
+        return tool.function.name, tool.function.arguments
+    if isinstance(args, dict):
+        args = {
+            name: " ".join(value.lower().split()) if isinstance(value, str) else value
+            for name, value in args.items()
+        }
+    return tool.function.name, json.dumps(args, sort_keys=True)
+
+
+def compact_tool_result(result, token_budget) -> str:
+    """JSON-encode a tool result, trimming its longest strings to fit the budget."""
+    max_chars = token_budget * CHARS_PER_TOKEN
+    content = json.dumps(result, ensure_ascii=False)
+    if len(content) <= max_chars:
+        return content
+
+    items = result if isinstance(result, list) else [result]
+    if items and all(isinstance(item, dict) for item in items):
+        # Leave room for the list brackets and ", " separators.
+        per_item = (max_chars - 2 * len(items)) // len(items)
+        items = [_fit_dict(item, per_item) for item in items]
+        content = json.dumps(items if isinstance(result, list) else items[0], ensure_ascii=False)
+        if len(content) <= max_chars:
+            return content
+
+    # Not a list of records (or metadata alone is too big): cut the raw JSON.
+    return content[:max(max_chars - len(TRUNCATION_MARKER), 0)] + TRUNCATION_MARKER
+
+
+def _fit_dict(item, max_chars):
+    item = dict(item)
+    while _json_length(item) > max_chars:
+        strings = [(len(value), name) for name, value in item.items() if isinstance(value, str)]
+        if not strings:
+            break
+        length, name = max(strings)
+        overflow = _json_length(item) - max_chars
+        keep = length - overflow - len(TRUNCATION_MARKER)
+        if keep <= 0:
+            # Emptying this field is not enough on its own; move to the next one.
+            if item[name] == "":
+                break
+            item[name] = ""
+            continue
+        item[name] = item[name][:keep] + TRUNCATION_MARKER
+    return item
+
+
+def _json_length(value):
+    return len(json.dumps(value, ensure_ascii=False))
@@ -0,0 +1,152 @@
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import chromadb
+import numpy as np
+
+from get_vector_store import COLLECTIONS, DOCS_COLLECTION, get_index_metadata, get_vector_store
+from quantized_store import QuantizedVectorStore
+
+# Chroma rejects very large single add() calls.
+ADD_BATCH_SIZE = 5000
+
+
+def main():
+    # Measure recall / latency / memory of index settings on our own vectors.
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--collection", default=DOCS_COLLECTION, choices=COLLECTIONS, help="Chroma collection to sample.")
+    parser.add_argument("--queries", type=int, default=100, help="Number of query vectors.")
+    parser.add_argument("--k", type=int, default=5, help="Neighbours per query.")
+    parser.add_argument("--space", default="l2", choices=["l2", "cosine", "ip"])
+    parser.add_argument("--m", type=int, nargs="+", default=[16], help="HNSW M values.")
+    parser.add_argument("--ef-construction", type=int, nargs="+", default=[100])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--dtypes", nargs="*", default=["int8", "float16", "float32"],
+                        help="Quantized store dtypes to compare.")
+    args = parser.parse_args()
+
+    items = get_vector_store(args.collection).get(include=["embeddings"])
+    vectors = np.asarray(items["embeddings"], dtype=np.float32)
+    ids = items["ids"]
+    if not len(ids):
+        print("❌ Collection is empty, nothing to benchmark")
+        return
+    print(f"📊 {len(ids)} vectors, {vectors.shape[1]} dims, k={args.k}, space={args.space}")
+
+    rng = np.random.default_rng(0)
+    query_rows = rng.choice(len(ids), size=min(args.queries, len(ids)), replace=False)
+    queries = vectors[query_rows]
+    truth = exact_neighbours(vectors, queries, args.k, args.space)
+
+    print("RSS ΔMB: measured growth of this process's resident memory over build + queries")
+    print("         (mmap pages count only once touched). est. MB: vectors + graph links.")
+    print("peak MB: largest tracemalloc peak of a single query (numpy temporaries included;")
+    print("         hnswlib allocates outside Python, so '-' for HNSW rows).")
+    print(f"{'index':<32} {'recall':>7} {'p50 ms':>8} {'p95 ms':>8} {'build s':>8} {'RSS ΔMB':>8} "
+          f"{'peak MB':>8} {'est. MB':>8}")
+    for m in args.m:
+        for ef_construction in args.ef_construction:
+            for ef_search in args.ef_search:
+                row = bench_hnsw(vectors, ids, queries, truth, args.k, args.space, m, ef_construction, ef_search)
+                print_row(f"hnsw M={m} efC={ef_construction} efS={ef_search}", *row)
+
+    for dtype in args.dtypes:
+        row = bench_quantized(vectors, ids, queries, truth, args.k, args.space, dtype)
+        print_row(f"mmap {dtype} (exact scan)", *row)
+
+
+def exact_neighbours(vectors, queries, k, space):
+    if space == "l2":
+        dist = (
+            np.sum(queries ** 2, axis=1)[:, None]
+            - 2 * queries @ vectors.T
+            + np.sum(vectors ** 2, axis=1)[None, :]
+        )
+    elif space == "cosine":
+        unit = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        q_unit = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        dist = 1.0 - q_unit @ unit.T
+    else:
+        dist = 1.0 - queries @ vectors.T
+    return [set(np.argsort(row)[:k]) for row in dist]
+
+
+def bench_hnsw(vectors, ids, queries, truth, k, space, m, ef_construction, ef_search):
+    gc.collect()
+    rss_before = current_rss_bytes()
+    client = chromadb.EphemeralClient()
+    name = f"bench_{m}_{ef_construction}_{ef_search}"
+    collection = client.create_collection(
+        name, metadata=get_index_metadata(space, m, ef_construction, ef_search)
+    )
+    row_ids = [str(i) for i in range(len(ids))]
+
+    start = time.perf_counter()
+    for i in range(0, len(row_ids), ADD_BATCH_SIZE):
+        collection.add(ids=row_ids[i:i + ADD_BATCH_SIZE], embeddings=vectors[i:i + ADD_BATCH_SIZE].tolist())
+    build_time = time.perf_counter() - start
+
+    latencies, hits = [], 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        result = collection.query(query_embeddings=[query.tolist()], n_results=k, include=[])
+        latencies.append(time.perf_counter() - start)
+        hits += len(expected & {int(i) for i in result["ids"][0]})
+    rss_delta = current_rss_bytes() - rss_before
+    client.delete_collection(name)
+
+    # hnswlib keeps float32 vectors plus ~2*M int32 links per node on layer 0.
+    est_bytes = vectors.shape[0] * (vectors.shape[1] * 4 + 2 * m * 4)
+    return hits / (len(truth) * k), latencies, build_time, rss_delta, None, est_bytes
+
+
+def bench_quantized(vectors, ids, queries, truth, k, space, dtype):
+    gc.collect()
+    rss_before = current_rss_bytes()
+    with tempfile.TemporaryDirectory() as path:
+        start = time.perf_counter()
+        QuantizedVectorStore.build(vectors, ids, [""] * len(ids), [{}] * len(ids),
+                                   path=path, dtype=dtype, space=space)
+        build_time = time.perf_counter() - start
+        store = QuantizedVectorStore(path, embedding_function=object())
+
+        latencies, hits, peak_bytes = [], 0, 0
+        for query, expected in zip(queries, truth):
+            tracemalloc.start()
+            start = time.perf_counter()
+            result = store.search_by_vector(query, k=k)
+            latencies.append(time.perf_counter() - start)
+            peak_bytes = max(peak_bytes, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            hits += len(expected & {row for row, _distance in result})
+        rss_delta = current_rss_bytes() - rss_before
+        est_bytes = store.nbytes()
+        del store
+    return hits / (len(truth) * k), latencies, build_time, rss_delta, peak_bytes, est_bytes
+
+
+def current_rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # Not Linux: fall back to peak RSS (kB on Linux/BSD, bytes on macOS).
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def print_row(label, recall, latencies, build_time, rss_delta, peak_bytes, est_bytes):
+    p50, p95 = np.percentile(np.asarray(latencies) * 1000, [50, 95])
+    peak = "-" if peak_bytes is None else f"{peak_bytes / 1e6:.1f}"
+    print(f"{label:<32} {recall:>7.3f} {p50:>8.2f} {p95:>8.2f} {build_time:>8.2f} "
+          f"{rss_delta / 1e6:>8.1f} {peak:>8} {est_bytes / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
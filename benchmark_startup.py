@@ -0,0 +1,161 @@
+import argparse
+import ast
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Scripts are executed with runpy under a non-"__main__" name, so module-level
+# code and imports run but main() / uvicorn do not.
+ENTRY_POINTS = [
+    "query_data.py",
+    "populate_docs.py",
+    "populate_database.py",
+    "crawl.py",
+    "yt-transcript.py",
+]
+
+# Written to stderr between phases so interpreter startup (site, encodings)
+# and the two phases can be told apart in the -X importtime output.
+START_MARKER = "startup_bench: module body"
+PHASE_MARKER = "startup_bench: deferred imports"
+
+# Phase 1 runs the module body; phase 2 imports what the script's functions
+# import on demand (argv[2:]), so deferred imports are measured as well.
+LOADER = f"""
+import importlib, json, runpy, sys, time
+sys.stderr.write({START_MARKER!r} + chr(10))
+start = time.perf_counter()
+runpy.run_path(sys.argv[1], run_name='startup_bench')
+body_ms = (time.perf_counter() - start) * 1000
+sys.stderr.write({PHASE_MARKER!r} + chr(10))
+failed = {{}}
+start = time.perf_counter()
+for name in sys.argv[2:]:
+    try:
+        importlib.import_module(name)
+    except Exception as e:
+        failed[name] = f"{{type(e).__name__}}: {{e}}"
+deferred_ms = (time.perf_counter() - start) * 1000
+print(chr(10) + json.dumps({{"body_ms": body_ms, "deferred_ms": deferred_ms, "failed": failed}}))
+"""
+
+
+def main():
+    # Track how much of each entry point's startup is spent importing modules,
+    # both at module load and on demand inside its functions.
+    parser = argparse.ArgumentParser()
+    parser.add_argument("scripts", nargs="*", default=ENTRY_POINTS, help="Entry points to measure.")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per script (best one is kept).")
+    parser.add_argument("--top", type=int, default=5, help="Heaviest imports to list per phase.")
+    parser.add_argument("--output", type=str, help="Append results as JSON lines to this file.")
+    args = parser.parse_args()
+
+    print("body ms: running the module body. on-demand ms: importing everything its functions")
+    print("         import later (including local modules they reach), on top of the body.")
+    print(f"{'script':<24} {'body ms':>9} {'on-demand ms':>13} {'body mods':>10} {'on-demand mods':>15}")
+    results = []
+    for script in args.scripts:
+        if not Path(script).is_file():
+            print(f"❌ {script}: no such file")
+            continue
+        deferred = deferred_imports(script)
+        runs = [measure(script, deferred) for _ in range(args.runs)]
+        best = min(runs, key=lambda run: run["body_ms"] + run["deferred_ms"])
+        results.append(best)
+
+        if best["error"]:
+            print(f"❌ {script}: {best['error']}")
+            continue
+        print(f"{script:<24} {best['body_ms']:>9.1f} {best['deferred_ms']:>13.1f} "
+              f"{best['body_module_count']:>10} {best['deferred_module_count']:>15}")
+        for phase in ("body", "deferred"):
+            for name, cumulative_ms in best[f"{phase}_top_imports"][:args.top]:
+                print(f"    {phase:<8} {cumulative_ms:8.1f} ms  {name}")
+        for name, error in best["failed"].items():
+            print(f"    ⚠️ not measured: {name} ({error})")
+
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps({"time": time.time(), **result}) + "\n")
+
+
+def deferred_imports(script):
+    """Modules imported inside function bodies of script and the local modules it reaches."""
+    root = Path(script).resolve().parent
+    deferred, seen, pending = [], set(), [Path(script)]
+    while pending:
+        path = pending.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        tree = ast.parse(path.read_text(encoding="utf-8"))
+        for node, in_function in _imports(tree):
+            for name in _imported_modules(node):
+                if in_function and name not in deferred:
+                    deferred.append(name)
+                local = root / f"{name.split('.')[0]}.py"
+                if local.exists():
+                    pending.append(local)
+    return deferred
+
+
+def _imports(tree, in_function=False):
+    for node in ast.iter_child_nodes(tree):
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            yield node, in_function
+        else:
+            yield from _imports(node, in_function or isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)))
+
+
+def _imported_modules(node):
+    if isinstance(node, ast.Import):
+        return [alias.name for alias in node.names]
+    if node.level == 0 and node.module != "__future__":
+        return [node.module]
+    return []
+
+
+def measure(script, deferred):
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", LOADER, script, *deferred],
+        capture_output=True, text=True,
+    )
+    _startup, _marker, script_stderr = process.stderr.partition(START_MARKER)
+    body_stderr, _marker, deferred_stderr = script_stderr.partition(PHASE_MARKER)
+    result = {"script": script, "deferred_imports": deferred, "error": None}
+    for phase, stderr in (("body", body_stderr), ("deferred", deferred_stderr)):
+        imports = parse_importtime(stderr)
+        # Top-level imports (no leading spaces in the name column) carry the
+        # cumulative cost of everything they pulled in.
+        result[f"{phase}_top_imports"] = sorted(
+            ((name.strip(), cumulative / 1000) for name, _self, cumulative in imports if not name.startswith(" ")),
+            key=lambda item: item[1], reverse=True,
+        )
+        result[f"{phase}_import_ms"] = sum(self_us for _name, self_us, _cumulative in imports) / 1000
+        result[f"{phase}_module_count"] = len(imports)
+
+    if process.returncode != 0:
+        stderr = process.stderr.strip()
+        result["error"] = stderr.splitlines()[-1] if stderr else "exit code " + str(process.returncode)
+        result.update(body_ms=0.0, deferred_ms=0.0, failed={})
+    else:
+        result.update(json.loads(process.stdout.strip().splitlines()[-1]))
+    return result
+
+
+def parse_importtime(stderr):
+    """Parse `-X importtime` lines into (name, self_us, cumulative_us)."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        imports.append((name[1:], int(self_us), int(cumulative_us)))
+    return imports
+
+
+if __name__ == "__main__":
+    main()
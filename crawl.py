@@ -1,6 +1,7 @@
+import argparse
 import re
-from playwright.async_api import async_playwright
 from collections import deque
+from contextlib import nullcontext
 import asyncio
 import time
 from pathlib import Path
@@ -61,8 +62,15 @@ async def get_page_content(page, url, base_url, root_url):
         print(f"❌ Error loading {url}: {e}")
         return None
 
-async def crawl_website(website_config):
-    """Crawl a single website using automatic link discovery with AI content filtering"""
+async def crawl_website(website_config, indexer=None):
+    """Crawl a single website using automatic link discovery with AI content filtering.
+
+    If a StreamingIndexer is given, every saved page is also queued for
+    embedding so it becomes searchable while the crawl is still running.
+    """
+    # Playwright is only needed for an actual crawl, not for --dry-run.
+    from playwright.async_api import async_playwright
+
     crawl_start_time = time.time()
     print(f"🚀 Starting crawling for {website_config['name']} website...")
     
@@ -146,14 +154,21 @@ async def crawl_website(website_config):
                             safe_filename = 'homepage'
                         
                         filename = data_dir / f"{safe_filename}_{learning_content_count}.txt"
+                        page_text = (
+                            f"{website_config['name'].title()} Website - {page_data['title']}\n"
+                            + "="*80 + "\n\n"
+                            + f"URL: {current_url}\n"
+                            + f"Title: {page_data['title']}\n\n"
+                            + page_data['content']
+                        )
                         with open(filename, 'w', encoding='utf-8') as f:
-                            f.write(f"{website_config['name'].title()} Website - {page_data['title']}\n")
-                            f.write("="*80 + "\n\n")
-                            f.write(f"URL: {current_url}\n")
-                            f.write(f"Title: {page_data['title']}\n\n")
-                            f.write(page_data['content'])
+                            f.write(page_text)
                         
                         print(f"✅ [{learning_content_count} learning/{crawled_count} total] Saved: {page_data['title'][:50]}... ({len(page_data['content'])} chars)")
+
+                        # Stream straight into the index; blocks here if the embedder falls behind.
+                        if indexer is not None:
+                            await indexer.put_page(page_text, {"source": str(filename), "website": website_config['name']})
                         
                         # Add new links to queue (filter to avoid infinite loops)
                         for link in page_data['links']:
@@ -191,14 +206,21 @@ async def crawl_website(website_config):
         finally:
             await browser.close()
 
-async def crawl_all_websites():
+async def crawl_all_websites(stream=False):
     """Crawl all configured websites"""
     total_crawl_start = time.time()
     print("🌐 Starting comprehensive multi-website crawling with AI content filtering...")
     
-    for website in websites:
-        await crawl_website(website)
-        print("\n" + "="*80 + "\n")
+    if stream:
+        from stream_index import StreamingIndexer
+        indexing = StreamingIndexer()
+    else:
+        indexing = nullcontext()  # yields None: pages are only written to docs/
+
+    async with indexing as indexer:
+        for website in websites:
+            await crawl_website(website, indexer)
+            print("\n" + "="*80 + "\n")
     
     total_crawl_end = time.time()
     total_crawl_time = total_crawl_end - total_crawl_start
@@ -207,7 +229,16 @@ async def crawl_all_websites():
 
 def main():
     """Main function to run the async crawler for all websites"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true", help="List configured websites without crawling.")
+    parser.add_argument("--stream", action="store_true", help="Embed pages into Chroma while crawling.")
+    args = parser.parse_args()
+    if args.dry_run:
+        for website in websites:
+            print(f"🧪 {website['name']}: {website['url']} -> ./docs/{website['name']}/")
+        return
+
     print("🌐 Starting automatic website discovery and crawling...")
-    asyncio.run(crawl_all_websites())
+    asyncio.run(crawl_all_websites(stream=args.stream))
 if __name__ == "__main__":
     main()
\ No newline at end of file
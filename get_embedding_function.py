@@ -1,8 +1,8 @@
-from langchain_ollama import OllamaEmbeddings
-from langchain_community.embeddings.bedrock import BedrockEmbeddings
-
-
 def get_embedding_function():
+    # Imported here so CLIs only pay for LangChain once they need embeddings.
+    from langchain_ollama import OllamaEmbeddings
+
+    # from langchain_community.embeddings.bedrock import BedrockEmbeddings
     # embeddings = BedrockEmbeddings(
     #     credentials_profile_name="default", region_name="us-east-1"
     # )
@@ -0,0 +1,146 @@
+import os
+from functools import lru_cache
+
+from get_embedding_function import get_embedding_function
+
+CHROMA_PATH = "chroma"
+QUANTIZED_PATH = "chroma_quantized"
+
+# One collection per source, so a search only scans the partition it needs.
+DATAS_COLLECTION = "datas"      # populate_database.py: flat datas/ corpus
+DOCS_COLLECTION = "docs"        # populate_docs.py: crawled sites, tagged with "website"
+YOUTUBE_COLLECTION = "youtube"  # yt-transcript.py: transcripts, tagged with "topic"
+COLLECTIONS = [DATAS_COLLECTION, DOCS_COLLECTION, YOUTUBE_COLLECTION]
+
+# Single collection everything was stored in before the per-source split
+# (LangChain's default name). migrate_collections.py moves it over.
+LEGACY_COLLECTION = "langchain"
+_legacy_checked = False
+_index_mismatch_warned = set()
+
+# HNSW index settings, passed to Chroma only when a collection is created.
+# An existing collection keeps what it was built with (get_vector_store warns
+# when these differ), so changing them requires a --reset (or a new collection).
+#   space:            "l2", "cosine" or "ip"
+#   M:                graph links per node (higher = better recall, more RAM)
+#   construction_ef:  candidate list size while building the graph
+#   search_ef:        candidate list size while querying (recall vs latency)
+HNSW_SPACE = os.getenv("CHROMA_HNSW_SPACE", "l2")
+HNSW_M = int(os.getenv("CHROMA_HNSW_M", "16"))
+HNSW_CONSTRUCTION_EF = int(os.getenv("CHROMA_HNSW_CONSTRUCTION_EF", "100"))
+HNSW_SEARCH_EF = int(os.getenv("CHROMA_HNSW_SEARCH_EF", "10"))
+
+# Largest distance still counted as a match (e.g. the YouTube cache lookup).
+# Chroma's "l2" is squared L2; for unit vectors the cosine/ip distance is half
+# of it, so 0.7 in l2 corresponds to 0.35. CHROMA_MATCH_DISTANCE overrides.
+MATCH_DISTANCE = {"l2": 0.7, "cosine": 0.35, "ip": 0.35}
+
+# What Chroma uses for collections created without hnsw:* metadata.
+CHROMA_DEFAULT_INDEX = {"hnsw:space": "l2", "hnsw:M": 16, "hnsw:construction_ef": 100, "hnsw:search_ef": 10}
+
+
+def get_index_metadata(
+    space: str = HNSW_SPACE,
+    m: int = HNSW_M,
+    construction_ef: int = HNSW_CONSTRUCTION_EF,
+    search_ef: int = HNSW_SEARCH_EF,
+) -> dict:
+    if space not in ("l2", "cosine", "ip"):
+        raise ValueError(f"Unsupported HNSW space: {space!r}")
+    return {
+        "hnsw:space": space,
+        "hnsw:M": m,
+        "hnsw:construction_ef": construction_ef,
+        "hnsw:search_ef": search_ef,
+    }
+
+
+@lru_cache(maxsize=1)
+def get_chroma_client():
+    import chromadb
+
+    return chromadb.PersistentClient(path=CHROMA_PATH)
+
+
+def get_vector_store(collection_name: str, **index_options):
+    # Chroma pulls in LangChain + chromadb, so import it only when a store is opened.
+    from langchain.vectorstores.chroma import Chroma
+
+    client = get_chroma_client()
+    index_metadata = get_index_metadata(**index_options)
+    existing = get_collection(client, collection_name)
+    if existing is not None:
+        # get_or_create_collection() would overwrite the stored metadata with
+        # ours, so the collection would no longer report the space it was built with.
+        warn_index_mismatch(collection_name, existing.metadata or {}, index_metadata)
+
+    db = Chroma(
+        client=client,
+        collection_name=collection_name,
+        persist_directory=CHROMA_PATH,
+        embedding_function=get_embedding_function(),
+        collection_metadata=index_metadata if existing is None else None,
+    )
+    warn_legacy_collection(client)
+    return db
+
+
+def get_collection(client, name: str):
+    names = [getattr(collection, "name", collection) for collection in client.list_collections()]
+    if name not in names:
+        return None
+    return client.get_collection(name)
+
+
+def warn_index_mismatch(collection_name: str, stored: dict, requested: dict):
+    # Warned once per collection and process; stores are reopened per request.
+    if collection_name in _index_mismatch_warned:
+        return
+    stored = {**CHROMA_DEFAULT_INDEX, **stored}
+    differences = [
+        f"{key}={stored[key]!r} (requested {value!r})"
+        for key, value in requested.items()
+        if stored.get(key, value) != value
+    ]
+    if differences:
+        _index_mismatch_warned.add(collection_name)
+        print(
+            f"⚠️ Collection '{collection_name}' keeps the index settings it was created with: "
+            f"{', '.join(differences)}. Rebuild it with --reset to apply CHROMA_HNSW_*."
+        )
+
+
+def get_legacy_collection(client):
+    return get_collection(client, LEGACY_COLLECTION)
+
+
+def warn_legacy_collection(client):
+    # Checked once per process: old data is invisible to every search until migrated.
+    global _legacy_checked
+    if _legacy_checked:
+        return
+    _legacy_checked = True
+    try:
+        legacy = get_legacy_collection(client)
+        count = legacy.count() if legacy is not None else 0
+    except Exception as e:
+        print(f"⚠️ Could not check for the legacy '{LEGACY_COLLECTION}' collection: {e}")
+        return
+    if count:
+        print(
+            f"⚠️ {count} documents are still in the old '{LEGACY_COLLECTION}' collection and are not searched. "
+            f"Run `python migrate_collections.py` to move them into {', '.join(COLLECTIONS)}."
+        )
+
+
+def get_match_distance(db) -> float:
+    override = os.getenv("CHROMA_MATCH_DISTANCE")
+    if override:
+        return float(override)
+    # Use the space the collection was actually created with, not the env default.
+    space = (db._collection.metadata or {}).get("hnsw:space", "l2")
+    return MATCH_DISTANCE[space]
+
+
+def clear_collection(collection_name: str):
+    get_vector_store(collection_name).delete_collection()
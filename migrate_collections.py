@@ -0,0 +1,74 @@
+import argparse
+import os
+
+from get_vector_store import (
+    DATAS_COLLECTION,
+    DOCS_COLLECTION,
+    LEGACY_COLLECTION,
+    YOUTUBE_COLLECTION,
+    get_legacy_collection,
+    get_vector_store,
+)
+from populate_docs import DATA_PATH as DOCS_PATH
+
+MIGRATE_BATCH_SIZE = 1000
+
+
+def main():
+    # Move rows of the old single collection into the per-source collections.
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keep", action="store_true", help=f"Keep the '{LEGACY_COLLECTION}' collection afterwards.")
+    args = parser.parse_args()
+
+    targets = {name: get_vector_store(name) for name in (DATAS_COLLECTION, DOCS_COLLECTION, YOUTUBE_COLLECTION)}
+    client = targets[DATAS_COLLECTION]._client
+    legacy = get_legacy_collection(client)
+    if legacy is None:
+        print(f"✅ No '{LEGACY_COLLECTION}' collection, nothing to migrate")
+        return
+
+    moved = {name: 0 for name in targets}
+    total = legacy.count()
+    for offset in range(0, total, MIGRATE_BATCH_SIZE):
+        items = legacy.get(
+            include=["embeddings", "documents", "metadatas"], limit=MIGRATE_BATCH_SIZE, offset=offset
+        )
+        batches = {name: {"ids": [], "embeddings": [], "documents": [], "metadatas": []} for name in targets}
+        for id_, embedding, document, metadata in zip(
+            items["ids"], items["embeddings"], items["documents"], items["metadatas"]
+        ):
+            metadata = dict(metadata or {})
+            name = target_collection(metadata)
+            batch = batches[name]
+            batch["ids"].append(id_)
+            # Existing embeddings are reused, nothing is re-embedded.
+            batch["embeddings"].append([float(value) for value in embedding])
+            batch["documents"].append(document)
+            batch["metadatas"].append(metadata)
+        for name, batch in batches.items():
+            if batch["ids"]:
+                targets[name]._collection.upsert(**batch)
+                moved[name] += len(batch["ids"])
+
+    print(f"👉 Migrated {total} documents: " + ", ".join(f"{name}={count}" for name, count in moved.items()))
+    if not args.keep:
+        client.delete_collection(LEGACY_COLLECTION)
+        print(f"✨ Deleted the '{LEGACY_COLLECTION}' collection")
+
+
+def target_collection(metadata: dict) -> str:
+    """Pick the new collection for a legacy row by its "source" (and tag docs with their website)."""
+    source = metadata.get("source") or ""
+    if source == "youtube":
+        return YOUTUBE_COLLECTION
+    parts = os.path.normpath(source).split(os.sep)
+    if parts[0] == DOCS_PATH:
+        # docs/<website>/<file> -> same "website" tag populate_docs.py adds.
+        if len(parts) > 2:
+            metadata.setdefault("website", parts[1])
+        return DOCS_COLLECTION
+    return DATAS_COLLECTION
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,15 @@
+from __future__ import annotations
+
 import argparse
 
 import os
-import shutil
-from langchain_community.document_loaders import UnstructuredMarkdownLoader
-from langchain_community.document_loaders import JSONLoader
-from langchain_community.document_loaders import TextLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain.schema.document import Document
-from get_embedding_function import get_embedding_function
-from langchain.vectorstores.chroma import Chroma
+from typing import TYPE_CHECKING
+from get_vector_store import DOCS_COLLECTION, clear_collection, get_vector_store
+
+if TYPE_CHECKING:
+    from langchain.schema.document import Document
 
 
-CHROMA_PATH = "chroma"
 DATA_PATH = "docs"
 
 
@@ -32,6 +30,9 @@ def main():
 
 
 def load_documents()->list[Document]:
+    # LangChain loaders are imported on demand to keep startup fast.
+    from langchain_community.document_loaders import JSONLoader, TextLoader, UnstructuredMarkdownLoader
+
     # Recursively walk through DATA_PATH folder and all subdirectories
     file=[]
     
@@ -55,8 +56,12 @@ def load_documents()->list[Document]:
                 continue
                 
             try:
+                # docs/<website>/... -> tag chunks so searches can filter per site.
+                website = os.path.relpath(root, DATA_PATH).split(os.sep)[0]
                 docs_lazy = document_loader.lazy_load()
                 for doc in docs_lazy:
+                    if website != ".":
+                        doc.metadata["website"] = website
                     file.append(doc)
             except Exception as e:
                 print(f"Error loading {full_path}: {e}")
@@ -66,6 +71,8 @@ def load_documents()->list[Document]:
 
 
 def split_documents(documents: list[Document]):
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
     text_splitter = RecursiveCharacterTextSplitter(
         chunk_size=800,
         chunk_overlap=80,
@@ -77,9 +84,7 @@ def split_documents(documents: list[Document]):
 
 def add_to_chroma(chunks: list[Document]):
     # Load the existing database.
-    db = Chroma(
-        persist_directory=CHROMA_PATH, embedding_function=get_embedding_function()
-    )
+    db = get_vector_store(DOCS_COLLECTION)
 
     # Calculate Page IDs.
     chunks_with_ids = calculate_chunk_ids(chunks)
@@ -134,8 +139,8 @@ def calculate_chunk_ids(chunks):
 
 
 def clear_database():
-    if os.path.exists(CHROMA_PATH):
-        shutil.rmtree(CHROMA_PATH)
+    # Only drop this script's collection; other sources share the same DB.
+    clear_collection(DOCS_COLLECTION)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,232 @@
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+
+from get_embedding_function import get_embedding_function
+from get_vector_store import COLLECTIONS, DOCS_COLLECTION, HNSW_SPACE, QUANTIZED_PATH, get_vector_store
+
+# Bytes of dequantized float32 rows per search block (a few thousand rows
+# for typical embedding sizes), so a search never holds the whole float32
+# matrix in memory, however small the collection.
+SEARCH_BLOCK_BYTES = int(os.getenv("QUANTIZED_SEARCH_BLOCK_BYTES", str(8 * 1024 * 1024)))
+
+
+class QuantizedVectorStore:
+    """Read-only, memory-mapped copy of a Chroma collection.
+
+    Vectors are stored as int8 (per-dimension scalar quantization), float16
+    or float32 in a .npy file that is opened with mmap, so large collections
+    are paged in by the OS instead of being loaded into RAM. Search is an
+    exact scan over the (de)quantized vectors, one small block at a time;
+    l2 uses squared row norms saved at build time (norms.npy), so no
+    block-sized difference matrix is created.
+
+    Document texts and metadata stay on disk in rows.sqlite and are read only
+    for the top-k hits. Each metadata key also gets an int32 column of value
+    codes (column_<n>.npy, memory-mapped) so equality filters are a single
+    vectorized comparison.
+    """
+
+    def __init__(self, path: str, embedding_function=None):
+        self.path = Path(path)
+        index = json.loads((self.path / "index.json").read_text(encoding="utf-8"))
+        self.dtype = index["dtype"]
+        self.space = index["space"]
+        self.columns = index["columns"]
+        self.vectors = np.load(self.path / "vectors.npy", mmap_mode="r")
+        if self.dtype == "int8":
+            self.offset = np.load(self.path / "offset.npy")
+            self.scale = np.load(self.path / "scale.npy")
+        self.norms = np.load(self.path / "norms.npy", mmap_mode="r")
+        self.vocabularies = {}  # metadata key -> {json value: code}, loaded on first filter
+        self.embedding_function = embedding_function or get_embedding_function()
+
+    @classmethod
+    def build(cls, embeddings, ids, documents, metadatas, path, dtype="int8", space=HNSW_SPACE):
+        if dtype not in ("int8", "float16", "float32"):
+            raise ValueError(f"Unsupported dtype: {dtype!r}")
+        out = Path(path)
+        if out.exists():
+            shutil.rmtree(out)
+        out.mkdir(parents=True)
+
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if space == "cosine":
+            # Store unit vectors so cosine distance becomes 1 - dot product.
+            vectors = _normalize(vectors)
+
+        if dtype == "int8":
+            low = vectors.min(axis=0)
+            high = vectors.max(axis=0)
+            scale = np.maximum(high - low, 1e-12) / 255.0
+            codes = np.round((vectors - low) / scale) - 128
+            codes = codes.astype(np.int8)
+            offset = (low + 128 * scale).astype(np.float32)
+            scale = scale.astype(np.float32)
+            np.save(out / "vectors.npy", codes)
+            np.save(out / "offset.npy", offset)
+            np.save(out / "scale.npy", scale)
+            # Norms of the vectors search will actually see, i.e. dequantized.
+            stored = codes.astype(np.float32) * scale + offset
+        else:
+            stored = vectors.astype(dtype)
+            np.save(out / "vectors.npy", stored)
+            stored = stored.astype(np.float32)
+        np.save(out / "norms.npy", np.einsum("ij,ij->i", stored, stored))
+        del stored
+
+        metadatas = [m or {} for m in metadatas]
+        with sqlite3.connect(out / "rows.sqlite") as conn:
+            conn.execute("CREATE TABLE rows (row INTEGER PRIMARY KEY, id TEXT, document TEXT, metadata TEXT)")
+            conn.executemany(
+                "INSERT INTO rows VALUES (?, ?, ?, ?)",
+                ((row, id_, document, json.dumps(metadata))
+                 for row, (id_, document, metadata) in enumerate(zip(ids, documents, metadatas))),
+            )
+        conn.close()
+
+        # One code column per metadata key; -1 marks rows without that key.
+        columns = {}
+        keys = sorted({key for metadata in metadatas for key in metadata})
+        for number, key in enumerate(keys):
+            vocabulary = {}
+            column = np.full(len(metadatas), -1, dtype=np.int32)
+            for row, metadata in enumerate(metadatas):
+                if key in metadata:
+                    column[row] = vocabulary.setdefault(json.dumps(metadata[key]), len(vocabulary))
+            name = f"column_{number}"
+            np.save(out / f"{name}.npy", column)
+            (out / f"{name}.json").write_text(json.dumps(list(vocabulary)), encoding="utf-8")
+            columns[key] = name
+
+        index = {"dtype": dtype, "space": space, "count": len(metadatas), "columns": columns}
+        (out / "index.json").write_text(json.dumps(index), encoding="utf-8")
+
+    @classmethod
+    def build_from_chroma(cls, db, path, dtype="int8", space=HNSW_SPACE):
+        items = db.get(include=["embeddings", "documents", "metadatas"])
+        cls.build(
+            items["embeddings"], items["ids"], items["documents"], items["metadatas"],
+            path=path, dtype=dtype, space=space,
+        )
+        return len(items["ids"])
+
+    def nbytes(self) -> int:
+        return int(self.vectors.size * self.vectors.itemsize)
+
+    def search_by_vector(self, query_vector, k: int = 4, filter: dict = None):
+        """Return [(row, distance)] for the k nearest rows, Chroma-style distances."""
+        query = np.asarray(query_vector, dtype=np.float32)
+        if self.space == "cosine":
+            query = _normalize(query[None, :])[0]
+
+        allowed = self._filter_mask(filter) if filter else None
+
+        query_norm = float(query @ query)
+        block_size = max(SEARCH_BLOCK_BYTES // (4 * max(self.vectors.shape[1], 1)), 1)
+        best_rows = np.empty(0, dtype=np.int64)
+        best_dist = np.empty(0, dtype=np.float32)
+        for start in range(0, len(self.vectors), block_size):
+            block = self._dequantize(self.vectors[start:start + block_size])
+            if self.space == "l2":
+                # ‖b - q‖² = ‖b‖² - 2·b·q + ‖q‖²
+                dist = self.norms[start:start + len(block)] - 2.0 * (block @ query) + query_norm
+                np.maximum(dist, 0.0, out=dist)  # rounding can dip just below zero
+            else:
+                dist = 1.0 - block @ query
+            rows = np.arange(start, start + len(block))
+            if allowed is not None:
+                mask = allowed[start:start + len(block)]
+                dist, rows = dist[mask], rows[mask]
+            best_rows = np.concatenate([best_rows, rows])
+            best_dist = np.concatenate([best_dist, dist])
+            if len(best_dist) > k:
+                keep = np.argpartition(best_dist, k)[:k]
+                best_rows, best_dist = best_rows[keep], best_dist[keep]
+
+        order = np.argsort(best_dist)
+        return [(int(best_rows[i]), float(best_dist[i])) for i in order]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, filter: dict = None):
+        from langchain.schema.document import Document
+
+        query_vector = self.embedding_function.embed_query(query)
+        hits = self.search_by_vector(query_vector, k=k, filter=filter)
+        rows = self.get_rows([row for row, _distance in hits])
+        results = []
+        for row, distance in hits:
+            _id, document, metadata = rows[row]
+            results.append((Document(page_content=document, metadata=metadata), distance))
+        return results
+
+    def get_rows(self, rows: list[int]) -> dict:
+        """Read (id, document, metadata) for the given rows from rows.sqlite."""
+        if not rows:
+            return {}
+        placeholders = ",".join("?" * len(rows))
+        conn = sqlite3.connect(self.path / "rows.sqlite")
+        try:
+            found = conn.execute(
+                f"SELECT row, id, document, metadata FROM rows WHERE row IN ({placeholders})",
+                [int(row) for row in rows],
+            ).fetchall()
+        finally:
+            conn.close()
+        return {row: (id_, document, json.loads(metadata)) for row, id_, document, metadata in found}
+
+    def _filter_mask(self, filter: dict):
+        allowed = np.ones(len(self.vectors), dtype=bool)
+        for key, value in filter.items():
+            if isinstance(value, dict):
+                raise ValueError(f"Only equality filters are supported, got {key}={value!r}")
+            name = self.columns.get(key)
+            if name is None:
+                return np.zeros(len(self.vectors), dtype=bool)
+            if key not in self.vocabularies:
+                vocabulary = json.loads((self.path / f"{name}.json").read_text(encoding="utf-8"))
+                self.vocabularies[key] = {encoded: code for code, encoded in enumerate(vocabulary)}
+            code = self.vocabularies[key].get(json.dumps(value))
+            if code is None:
+                return np.zeros(len(self.vectors), dtype=bool)
+            allowed &= np.load(self.path / f"{name}.npy", mmap_mode="r") == code
+        return allowed
+
+    def _dequantize(self, block):
+        dequantized = block.astype(np.float32)
+        if self.dtype == "int8":
+            dequantized *= self.scale
+            dequantized += self.offset
+        return dequantized
+
+
+def get_quantized_path(collection_name: str) -> str:
+    return os.path.join(QUANTIZED_PATH, collection_name)
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def main():
+    # Export a Chroma collection into a quantized, memory-mapped store.
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--collection", default=DOCS_COLLECTION, choices=COLLECTIONS, help="Chroma collection to export.")
+    parser.add_argument("--dtype", default="int8", choices=["int8", "float16", "float32"])
+    parser.add_argument("--space", default=HNSW_SPACE, choices=["l2", "cosine", "ip"])
+    parser.add_argument("--path", default=None, help=f"Output directory (default {QUANTIZED_PATH}/<collection>).")
+    args = parser.parse_args()
+    path = args.path or get_quantized_path(args.collection)
+
+    db = get_vector_store(args.collection)
+    count = QuantizedVectorStore.build_from_chroma(db, path=path, dtype=args.dtype, space=args.space)
+    print(f"✅ Exported {count} vectors to {path} ({args.dtype}, {args.space})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,7 @@
 import argparse
-from langchain.vectorstores.chroma import Chroma
-from langchain.prompts import ChatPromptTemplate
-from langchain_ollama import OllamaLLM,ChatOllama
+import os
 
-from get_embedding_function import get_embedding_function
-
-CHROMA_PATH = "chroma"
+from get_vector_store import COLLECTIONS, DATAS_COLLECTION, DOCS_COLLECTION, QUANTIZED_PATH, get_vector_store
 
 PROMPT_TEMPLATE = """
 Answer the question based only on the following context:
@@ -22,18 +18,47 @@ def main():
     # Create CLI.
     parser = argparse.ArgumentParser()
     parser.add_argument("query_text", type=str, help="The query text.")
+    parser.add_argument("--collection", action="append", choices=COLLECTIONS,
+                        help="Collection to search (repeatable). Defaults to datas + docs.")
+    parser.add_argument("--website", type=str, help="Only search crawled docs of this website.")
+    parser.add_argument("--quantized", action="store_true", help=f"Search the quantized stores in {QUANTIZED_PATH}/.")
     args = parser.parse_args()
     query_text = args.query_text
-    query_rag(query_text)
-
-
-def query_rag(query_text: str):
-    # Prepare the DB.
-    embedding_function = get_embedding_function()
-    db = Chroma(persist_directory=CHROMA_PATH, embedding_function=embedding_function)
-
-    # Search the DB.
-    results = db.similarity_search_with_score(query_text, k=5)
+    query_rag(query_text, collections=args.collection, website=args.website, quantized=args.quantized)
+
+
+def query_rag(query_text: str, collections: list[str] = None, website: str = None, quantized: bool = False):
+    # Heavy imports are deferred so `--help` and argument errors return instantly.
+    from langchain.prompts import ChatPromptTemplate
+    from langchain_ollama import ChatOllama
+
+    # Only scan the partitions that can answer the query.
+    if collections is None:
+        collections = [DOCS_COLLECTION] if website else [DATAS_COLLECTION, DOCS_COLLECTION]
+    search_filter = {"website": website} if website else None
+
+    # Search each collection and keep the overall best matches.
+    results = []
+    searched = []
+    for collection in collections:
+        if quantized:
+            from quantized_store import QuantizedVectorStore, get_quantized_path
+            path = get_quantized_path(collection)
+            if not os.path.exists(os.path.join(path, "index.json")):
+                print(f"⚠️ No quantized export of '{collection}' in {path}, skipping it. "
+                      f"Run `python quantized_store.py --collection {collection}` to create it.")
+                continue
+            db = QuantizedVectorStore(path)
+        else:
+            db = get_vector_store(collection)
+        results.extend(db.similarity_search_with_score(query_text, k=5, filter=search_filter))
+        searched.append(collection)
+    if not searched:
+        raise FileNotFoundError(
+            f"No quantized export found for {', '.join(collections)} in {QUANTIZED_PATH}/. "
+            f"Run `python quantized_store.py --collection <name>` first."
+        )
+    results = sorted(results, key=lambda result: result[1])[:5]
 
     context_text = "\n\n---\n\n".join([doc.page_content for doc, _score in results])
     prompt_template = ChatPromptTemplate.from_template(PROMPT_TEMPLATE)
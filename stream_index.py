@@ -0,0 +1,114 @@
+import asyncio
+import os
+import time
+
+from get_vector_store import DOCS_COLLECTION, get_vector_store
+
+# Pages per Chroma commit, and how long a partial batch may wait before it
+# is committed anyway, so fresh pages become searchable within seconds.
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "16"))
+STREAM_FLUSH_SECONDS = float(os.getenv("STREAM_FLUSH_SECONDS", "2"))
+
+# Pages waiting to be embedded. When full, the crawler blocks on put() until
+# the embedder catches up (back-pressure).
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "32"))
+
+# A batch whose embed/upsert fails (e.g. Ollama restarting) is retried this
+# many times, with a doubling delay, before its pages are counted as failed.
+STREAM_RETRIES = int(os.getenv("STREAM_RETRIES", "3"))
+STREAM_RETRY_DELAY = float(os.getenv("STREAM_RETRY_DELAY", "1"))
+
+_STOP = object()
+
+
+class StreamingIndexer:
+    """Split -> embed -> Chroma upsert pages while the crawler is still running.
+
+    Use as an async context manager; leaving it flushes whatever is queued.
+    """
+
+    def __init__(self, collection_name: str = DOCS_COLLECTION, batch_size: int = STREAM_BATCH_SIZE,
+                 flush_seconds: float = STREAM_FLUSH_SECONDS, queue_size: int = STREAM_QUEUE_SIZE,
+                 workers: int = 1):
+        self.collection_name = collection_name
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.workers = workers
+        self.tasks = []
+        self.db = None
+        self.indexed_pages = 0
+        self.indexed_chunks = 0
+        self.failed_sources = []
+
+    async def __aenter__(self):
+        self.db = await asyncio.to_thread(get_vector_store, self.collection_name)
+        self.tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        for _ in self.tasks:
+            await self.queue.put(_STOP)
+        await asyncio.gather(*self.tasks)
+        print(f"📥 Streaming index done: {self.indexed_pages} pages, {self.indexed_chunks} chunks")
+        if self.failed_sources:
+            print(f"⚠️ {len(self.failed_sources)} pages could not be indexed and are not searchable yet. "
+                  f"Run `python populate_docs.py` to add them, e.g. {self.failed_sources[0]}")
+
+    async def put_page(self, text: str, metadata: dict):
+        """Queue one page; metadata must include "source" (its docs/ file path)."""
+        await self.queue.put((text, metadata))
+
+    async def _worker(self):
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                item = None
+
+            if item is not None and item is not _STOP:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_seconds
+
+            if batch and (item is None or item is _STOP or len(batch) >= self.batch_size):
+                await self._commit(batch)
+                batch, deadline = [], None
+
+            if item is _STOP:
+                return
+
+    async def _commit(self, pages):
+        delay = STREAM_RETRY_DELAY
+        for attempt in range(STREAM_RETRIES + 1):
+            try:
+                # Embedding and the Chroma write are blocking; keep them off the loop.
+                chunk_count = await asyncio.to_thread(self._index, pages)
+                break
+            except Exception as e:
+                print(f"⚠️ Error indexing {len(pages)} streamed pages (attempt {attempt + 1}): {e}")
+                if attempt == STREAM_RETRIES:
+                    self.failed_sources.extend(metadata.get("source") for _text, metadata in pages)
+                    return
+                await asyncio.sleep(delay)
+                delay *= 2
+        self.indexed_pages += len(pages)
+        self.indexed_chunks += chunk_count
+        print(f"📥 Indexed {len(pages)} pages ({chunk_count} chunks), {self.queue.qsize()} queued")
+
+    def _index(self, pages):
+        from langchain.schema.document import Document
+
+        from populate_docs import calculate_chunk_ids, split_documents
+
+        # Same splitting and chunk IDs as populate_docs.py, so a later full
+        # populate run recognizes these chunks instead of duplicating them.
+        documents = [Document(page_content=text, metadata=metadata) for text, metadata in pages]
+        chunks = calculate_chunk_ids(split_documents(documents))
+        if chunks:
+            self.db.add_documents(chunks, ids=[chunk.metadata["id"] for chunk in chunks])
+            self.db.persist()
+        return len(chunks)
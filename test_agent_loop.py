@@ -0,0 +1,121 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from agent_loop import call_key, compact_tool_result, run_agent_loop
+
+
+def tool_call(id_, topic, name="getYoutubeContent"):
+    return SimpleNamespace(id=id_, function=SimpleNamespace(name=name, arguments=json.dumps({"topic": topic})))
+
+
+def completion(content=None, tool_calls=None):
+    message = SimpleNamespace(role="assistant", content=content, tool_calls=tool_calls)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class FakeCompletions:
+    """Replays scripted completions and records the tool_choice of each call."""
+
+    def __init__(self, *completions):
+        self.completions = list(completions)
+        self.tool_choices = []
+
+    def __call__(self, messages, tool_choice):
+        self.tool_choices.append(tool_choice)
+        return self.completions.pop(0)
+
+
+def make_handler(calls):
+    async def handler(topic):
+        calls.append(topic)
+        return [{"video_id": topic, "transcript": "text"}]
+    return {"getYoutubeContent": handler}
+
+
+def tool_messages(messages):
+    return [message for message in messages if isinstance(message, dict) and message.get("role") == "tool"]
+
+
+def test_call_key_normalizes_string_arguments():
+    assert call_key(tool_call("1", "  Python   ASYNC ")) == call_key(tool_call("2", "python async"))
+    assert call_key(tool_call("1", "python")) != call_key(tool_call("2", "rust"))
+    assert call_key(tool_call("1", "python")) != call_key(tool_call("2", "python", name="other"))
+
+
+def test_call_key_keeps_unparseable_arguments():
+    tool = SimpleNamespace(id="1", function=SimpleNamespace(name="getYoutubeContent", arguments="{not json"))
+    assert call_key(tool) == ("getYoutubeContent", "{not json")
+
+
+def test_duplicate_calls_in_one_turn_run_once():
+    calls = []
+    fake = FakeCompletions(
+        completion(tool_calls=[tool_call("a", "Python"), tool_call("b", "python ")]),
+        completion(content="[]"),
+    )
+    messages = []
+
+    final = asyncio.run(run_agent_loop(fake, messages, make_handler(calls)))
+
+    assert final.content == "[]"
+    assert calls == ["Python"]
+    replies = tool_messages(messages)
+    assert [reply["tool_call_id"] for reply in replies] == ["a", "b"]
+    assert json.loads(replies[0]["content"])[0]["video_id"] == "Python"
+    assert "already answered by tool call a" in json.loads(replies[1]["content"])
+
+
+def test_duplicate_calls_across_turns_run_once():
+    calls = []
+    fake = FakeCompletions(
+        completion(tool_calls=[tool_call("a", "python")]),
+        completion(tool_calls=[tool_call("b", "PYTHON"), tool_call("c", "rust")]),
+        completion(content="[]"),
+    )
+    messages = []
+
+    asyncio.run(run_agent_loop(fake, messages, make_handler(calls)))
+
+    assert calls == ["python", "rust"]
+    replies = {reply["tool_call_id"]: reply["content"] for reply in tool_messages(messages)}
+    assert "already answered by tool call a" in json.loads(replies["b"])
+    assert json.loads(replies["c"])[0]["video_id"] == "rust"
+    assert fake.tool_choices == ["auto", "auto", "auto"]
+
+
+def test_iteration_cap_forces_final_answer():
+    calls = []
+    fake = FakeCompletions(
+        completion(tool_calls=[tool_call("a", "one")]),
+        completion(tool_calls=[tool_call("b", "two")]),
+        completion(content='[{"aiScore": 5}]'),
+    )
+    messages = []
+
+    final = asyncio.run(run_agent_loop(fake, messages, make_handler(calls), max_iterations=2))
+
+    assert calls == ["one", "two"]
+    assert fake.tool_choices == ["auto", "auto", "none"]
+    assert final.content == '[{"aiScore": 5}]'
+    assert messages[-1] is final
+
+
+def test_compact_tool_result_fits_budget_and_stays_valid_json():
+    result = [
+        {"video_id": str(index), "title": "Café", "transcript": "é" * 5000 + "x" * 5000}
+        for index in range(3)
+    ]
+    content = compact_tool_result(result, token_budget=200)
+
+    assert len(content) <= 200 * 4
+    parsed = json.loads(content)
+    assert [video["video_id"] for video in parsed] == ["0", "1", "2"]
+    assert all(video["title"] == "Café" for video in parsed)
+    assert all(video["transcript"].startswith("é") for video in parsed)
+    assert all(video["transcript"].endswith("…[truncated]") for video in parsed)
+
+
+def test_compact_tool_result_leaves_small_results_untouched():
+    result = [{"video_id": "1", "transcript": "short"}]
+    assert json.loads(compact_tool_result(result, token_budget=100)) == result
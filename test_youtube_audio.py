@@ -0,0 +1,108 @@
+import os
+import subprocess
+import sys
+import time
+import types
+from types import SimpleNamespace
+
+import pytest
+
+import youtube_audio
+from youtube_audio import StubTranscriptionClient, transcribe_download, transcribe_file, transcribe_stream
+
+
+class RaisingClient:
+    def __init__(self):
+        self.audio = SimpleNamespace(transcriptions=self)
+
+    def create(self, file, **kwargs):
+        raise RuntimeError("whisper unavailable")
+
+
+@pytest.fixture
+def audio_file(tmp_path):
+    path = tmp_path / "tiny.ogg"
+    path.write_bytes(b"OggS\x00fake")
+    return path
+
+
+@pytest.fixture
+def fake_yt_dlp(monkeypatch, audio_file):
+    # "Downloads" the tiny local file into yt-dlp's output template.
+    downloads = []
+
+    class YoutubeDL:
+        def __init__(self, opts):
+            self.outtmpl = opts["outtmpl"]
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def extract_info(self, url, download):
+            return {"ext": "ogg"}
+
+        def prepare_filename(self, info):
+            path = self.outtmpl.replace("%(ext)s", info["ext"])
+            with open(path, "wb") as f:
+                f.write(audio_file.read_bytes())
+            downloads.append(path)
+            return path
+
+    monkeypatch.setitem(sys.modules, "yt_dlp", types.SimpleNamespace(YoutubeDL=YoutubeDL))
+    return downloads
+
+
+def fake_segmenter(count, delay):
+    # Stands in for ffmpeg: writes `count` segment files, one every `delay` seconds.
+    script = (
+        "import sys, time\n"
+        f"for i in range({count}):\n"
+        "    open(f'{sys.argv[1]}/segment_{i:04d}.ogg', 'wb').write(b'OggS')\n"
+        f"    time.sleep({delay})\n"
+    )
+
+    def start_segmenter(video_id, out_dir, segment_seconds):
+        return subprocess.Popen([sys.executable, "-c", script, out_dir],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    return start_segmenter
+
+
+def test_transcribe_file_offsets_segments(audio_file):
+    segments = transcribe_file(StubTranscriptionClient(), audio_file, offset=300)
+    assert segments == [{"text": "[stub transcription of tiny.ogg]", "start": 300.0, "end": 301.5}]
+
+
+def test_transcribe_file_without_segments(audio_file):
+    client = StubTranscriptionClient()
+    client.create = lambda file, **kwargs: SimpleNamespace(text="plain text")
+    assert transcribe_file(client, audio_file, offset=60) == [{"text": "plain text", "start": 60, "end": None}]
+
+
+def test_transcribe_download_with_stub(fake_yt_dlp):
+    segments = transcribe_download("abc", StubTranscriptionClient())
+    assert segments[0]["text"] == "[stub transcription of abc.ogg]"
+    assert not os.path.exists(os.path.dirname(fake_yt_dlp[0]))
+
+
+def test_transcribe_download_removes_temp_dir_when_client_raises(fake_yt_dlp):
+    with pytest.raises(RuntimeError, match="whisper unavailable"):
+        transcribe_download("abc", RaisingClient())
+    assert not os.path.exists(os.path.dirname(fake_yt_dlp[0]))
+
+
+def test_transcribe_stream_offsets_segments(monkeypatch):
+    monkeypatch.setattr(youtube_audio, "start_segmenter", fake_segmenter(3, 0))
+    segments = transcribe_stream("abc", StubTranscriptionClient(), segment_seconds=300)
+    assert [(s["start"], s["end"]) for s in segments] == [(0.0, 1.5), (300.0, 301.5), (600.0, 601.5)]
+
+
+def test_transcribe_stream_stops_on_failed_segment(monkeypatch):
+    # 100 segments at 0.2s each would take ~20s if the failure went unnoticed.
+    monkeypatch.setattr(youtube_audio, "start_segmenter", fake_segmenter(100, 0.2))
+    start = time.monotonic()
+    with pytest.raises(RuntimeError, match="whisper unavailable"):
+        transcribe_stream("abc", RaisingClient(), segment_seconds=300)
+    assert time.monotonic() - start < 5
@@ -0,0 +1,171 @@
+import functools
+import glob
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+WHISPER_MODEL = "whisper-large-v3-turbo"
+WHISPER_PROMPT = "Specify context or spelling and response must be translate in English"
+
+# "stream": pipe the audio stream through ffmpeg into small 16 kHz mono
+#           segments and transcribe them in parallel while it is still running.
+# "download": fetch the whole best-audio file first, then upload it in one go.
+TRANSCRIBE_MODE = os.getenv("YT_TRANSCRIBE_MODE", "stream")
+SEGMENT_SECONDS = int(os.getenv("YT_SEGMENT_SECONDS", "300"))
+SEGMENT_WORKERS = int(os.getenv("YT_SEGMENT_WORKERS", "4"))
+
+# Audio downloads and Whisper uploads are heavy, so each stage has its own
+# process-wide cap shared by every request. The transcribe cap bounds uploads
+# across all videos: segment workers beyond it simply wait for a slot, so it
+# defaults to SEGMENT_WORKERS to let one video use its full parallelism.
+DOWNLOAD_SEMAPHORE = threading.BoundedSemaphore(int(os.getenv("YT_DOWNLOAD_CONCURRENCY", "2")))
+TRANSCRIBE_SEMAPHORE = threading.BoundedSemaphore(
+    int(os.getenv("YT_TRANSCRIBE_CONCURRENCY", str(SEGMENT_WORKERS)))
+)
+
+
+class StubTranscriptionClient:
+    """Offline stand-in for the Groq client (TRANSCRIPTION_CLIENT=stub)."""
+
+    def __init__(self):
+        self.audio = SimpleNamespace(transcriptions=self)
+
+    def create(self, file, **kwargs):
+        # One fake verbose_json segment per file, so callers see real timestamps.
+        text = f"[stub transcription of {os.path.basename(file.name)}]"
+        return SimpleNamespace(text=text, segments=[{"text": text, "start": 0.0, "end": 1.5}])
+
+
+@functools.lru_cache(maxsize=None)
+def get_transcription_client():
+    if os.getenv("TRANSCRIPTION_CLIENT") == "stub":
+        return StubTranscriptionClient()
+    from groq import Groq
+    return Groq(api_key=os.getenv("GROQ_API_KEY"))
+
+
+def transcribe_audio(video_id, transcription_client=None, mode=TRANSCRIBE_MODE):
+    transcription_client = transcription_client or get_transcription_client()
+    if mode == "stream" and shutil.which("ffmpeg"):
+        return transcribe_stream(video_id, transcription_client)
+    return transcribe_download(video_id, transcription_client)
+
+
+def transcribe_file(transcription_client, audio_file, offset=0.0):
+    """Transcribe one file into timed segments ({text, start, end}, in seconds)."""
+    with TRANSCRIBE_SEMAPHORE:
+        with open(audio_file, "rb") as f:
+            transcription = transcription_client.audio.transcriptions.create(
+                file=f,  # Pass file object, not string
+                model=WHISPER_MODEL,
+                prompt=WHISPER_PROMPT,  # Optional
+                language="en",
+                response_format="verbose_json",  # includes per-segment timestamps
+                temperature=0.0
+            )
+
+    segments = getattr(transcription, "segments", None)
+    if not segments:
+        return [{"text": transcription.text, "start": offset, "end": None}]
+    timed = []
+    for segment in segments:
+        if not isinstance(segment, dict):
+            segment = vars(segment)
+        timed.append({
+            "text": segment["text"],
+            "start": offset + segment["start"],
+            "end": offset + segment["end"],
+        })
+    return timed
+
+
+def transcribe_download(video_id, transcription_client):
+    from yt_dlp import YoutubeDL
+
+    # Temp dir is removed even if the download or transcription raises.
+    with tempfile.TemporaryDirectory(prefix=f"yt-{video_id}-") as tmp_dir:
+        with DOWNLOAD_SEMAPHORE:
+            ydl_opts = {
+                'format': 'bestaudio/best',
+                'outtmpl': os.path.join(tmp_dir, f'{video_id}.%(ext)s'),
+                'quiet': True,
+            }
+            with YoutubeDL(ydl_opts) as ydl:
+                info = ydl.extract_info(video_url(video_id), download=True)
+                # Use whatever extension yt-dlp actually picked (webm, m4a, ...).
+                audio_file = ydl.prepare_filename(info)
+        return transcribe_file(transcription_client, audio_file)
+
+
+def transcribe_stream(video_id, transcription_client,
+                      segment_seconds=SEGMENT_SECONDS, workers=SEGMENT_WORKERS):
+    with tempfile.TemporaryDirectory(prefix=f"yt-{video_id}-") as tmp_dir:
+        futures = {}
+        failed = None
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # The download slot is held only while ffmpeg reads the stream,
+            # not while the remaining segments are being transcribed.
+            with DOWNLOAD_SEMAPHORE:
+                process = start_segmenter(video_id, tmp_dir, segment_seconds)
+                try:
+                    while True:
+                        finished = process.poll() is not None
+                        segments = sorted(glob.glob(os.path.join(tmp_dir, "segment_*.ogg")))
+                        # The newest segment is still being written until ffmpeg exits.
+                        ready = segments if finished else segments[:-1]
+                        for segment in ready:
+                            if segment not in futures:
+                                offset = len(futures) * segment_seconds
+                                futures[segment] = pool.submit(transcribe_file, transcription_client, segment, offset)
+                        # Stop streaming as soon as one segment fails.
+                        failed = next(
+                            (future for future in futures.values() if future.done() and future.exception()), None
+                        )
+                        if finished or failed:
+                            break
+                        time.sleep(0.5)
+                finally:
+                    if process.poll() is None:
+                        process.kill()
+                    _, stderr = process.communicate()
+
+            if failed:
+                for future in futures.values():
+                    future.cancel()
+                raise failed.exception()
+            if process.returncode != 0:
+                raise RuntimeError(f"ffmpeg failed for {video_id}: {stderr.decode(errors='ignore').strip()}")
+            return [timed for segment in sorted(futures) for timed in futures[segment].result()]
+
+
+def start_segmenter(video_id, out_dir, segment_seconds):
+    from yt_dlp import YoutubeDL
+
+    # Resolve the best-audio stream URL without downloading it.
+    with YoutubeDL({'format': 'bestaudio/best', 'quiet': True}) as ydl:
+        info = ydl.extract_info(video_url(video_id), download=False)
+    headers = "".join(f"{key}: {value}\r\n" for key, value in info.get("http_headers", {}).items())
+
+    # ffmpeg reads the stream over HTTP, downsamples to 16 kHz mono (all
+    # Whisper uses) and cuts it into fixed-length Opus segments.
+    command = [
+        "ffmpeg", "-nostdin", "-loglevel", "error",
+        "-headers", headers, "-i", info["url"],
+        "-vn", "-ac", "1", "-ar", "16000", "-c:a", "libopus", "-b:a", "24k",
+        "-f", "segment", "-segment_time", str(segment_seconds), "-reset_timestamps", "1",
+        os.path.join(out_dir, "segment_%04d.ogg"),
+    ]
+    return subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+
+def video_url(video_id):
+    return f"https://www.youtube.com/watch?v={video_id}"
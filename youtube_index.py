@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from langchain.schema.document import Document
+
+# Same chunk size as populate_database.py / populate_docs.py.
+CHUNK_SIZE = 800
+EMBED_BATCH_SIZE = int(os.getenv("YT_EMBED_BATCH_SIZE", "64"))
+
+# Chunks per video handed back to the LLM from the cache, so a long
+# transcript cannot flood its context.
+CACHED_CHUNKS_PER_VIDEO = int(os.getenv("YT_CACHED_CHUNKS_PER_VIDEO", "4"))
+
+TOPIC_CACHE_PATH = "youtube_topic_cache.json"
+TOPIC_CACHE_TTL = int(os.getenv("YT_TOPIC_CACHE_TTL", str(7 * 24 * 3600)))
+
+
+class TopicCache:
+    """Topic -> {video ID: chosen chunk IDs} map persisted as JSON, with a TTL per entry.
+
+    Storing the chunk IDs lets a hit load exactly the chunks the first answer
+    used with db.get(ids=...): no embedding call and no similarity scan.
+    """
+
+    def __init__(self, path: str = TOPIC_CACHE_PATH, ttl: int = TOPIC_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Ignoring unreadable topic cache {path}: {e}")
+
+    def get(self, topic: str):
+        with self.lock:
+            entry = self.entries.get(normalize_topic(topic))
+            # Entries without "chunk_ids" were written by older versions; treat as a miss.
+            if entry and "chunk_ids" in entry and time.time() - entry["time"] < self.ttl:
+                return entry["chunk_ids"]
+            return None
+
+    def set(self, topic: str, chunk_ids: dict[str, list[str]]):
+        if not chunk_ids:
+            return
+        with self.lock:
+            now = time.time()
+            self.entries = {
+                key: entry for key, entry in self.entries.items() if now - entry["time"] < self.ttl
+            }
+            self.entries[normalize_topic(topic)] = {"chunk_ids": chunk_ids, "time": now}
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
+
+
+def normalize_topic(topic: str) -> str:
+    return " ".join(topic.lower().split())
+
+
+def chunk_transcript(segments: list[dict], chunk_size: int = CHUNK_SIZE) -> list[dict]:
+    """Merge timed transcript segments ({text, start, end}) into ~chunk_size chunks."""
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=0)
+    chunks = []
+    current = None
+    for segment in segments:
+        text = segment["text"].strip()
+        if not text:
+            continue
+        # A single long segment (e.g. Whisper without timestamps) is split on its own.
+        for piece in splitter.split_text(text) if len(text) > chunk_size else [text]:
+            if current and len(current["text"]) + len(piece) + 1 > chunk_size:
+                chunks.append(current)
+                current = None
+            if current is None:
+                current = {"text": piece, "start": segment["start"], "end": segment.get("end")}
+            else:
+                current["text"] += " " + piece
+                current["end"] = segment.get("end")
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def build_documents(video: dict, chunks: list[dict], topic: str) -> list[Document]:
+    from langchain.schema.document import Document
+
+    docs = []
+    for index, chunk in enumerate(chunks):
+        metadata = {
+            "title": video['title'],
+            "description": video['description'],
+            "video_id": video['video_id'],
+            "url": video['url'],
+            "thumbnail": video['thumbnail'],
+            "source": "youtube",
+            "topic": topic,
+            "chunk": index,
+            "start": float(chunk["start"]),
+            "id": f"youtube:{video['video_id']}:{index}"
+        }
+        if chunk.get("end") is not None:
+            metadata["end"] = float(chunk["end"])
+        docs.append(Document(page_content=chunk["text"], metadata=metadata))
+    return docs
+
+
+def add_videos_to_rag(db, videos_with_segments, topic):
+    try:
+        # Videos are written as a whole, so the first chunk marks one as indexed.
+        # Older whole-transcript documents used the same ID but have no "chunk"
+        # field; those are re-chunked and their ":0" row is overwritten (upsert).
+        first_ids = [f"youtube:{video['video_id']}:0" for video, _segments in videos_with_segments]
+        existing = db.get(ids=first_ids, include=["metadatas"]) if first_ids else {"ids": [], "metadatas": []}
+        chunked_ids = {
+            id_ for id_, metadata in zip(existing["ids"], existing["metadatas"])
+            if metadata and "chunk" in metadata
+        }
+
+        docs = []
+        for video, segments in videos_with_segments:
+            if f"youtube:{video['video_id']}:0" in chunked_ids:
+                print(f"📋 Video {video['video_id']} already exists in RAG system")
+                continue
+            docs.extend(build_documents(video, chunk_transcript(segments), topic))
+        if not docs:
+            return
+
+        print(f"👉 Adding {len(docs)} transcript chunks to RAG system")
+        for start in range(0, len(docs), EMBED_BATCH_SIZE):
+            batch = docs[start:start + EMBED_BATCH_SIZE]
+            db.add_documents(batch, ids=[doc.metadata["id"] for doc in batch])
+        db.persist()
+
+    except Exception as e:
+        print(f"⚠️ Error adding to RAG system: {e}")
+
+
+def videos_from_documents(docs: list[Document], chunks_per_video: int = CACHED_CHUNKS_PER_VIDEO) -> list[dict]:
+    """Group transcript chunks back into one compact result per video."""
+    videos = {}
+    for doc in docs:
+        video_id = doc.metadata.get('video_id', '')
+        video = videos.setdefault(video_id, {
+            'title': doc.metadata.get('title', ''),
+            'description': doc.metadata.get('description', ''),
+            'transcript': [],
+            'video_id': video_id,
+            'url': doc.metadata.get('url', ''),
+            'thumbnail': doc.metadata.get('thumbnail', ''),
+        })
+        if len(video['transcript']) < chunks_per_video:
+            video['transcript'].append(f"[{format_timestamp(doc.metadata.get('start', 0))}] {doc.page_content}")
+    for video in videos.values():
+        video['transcript'] = "\n".join(video['transcript'])
+    return list(videos.values())
+
+
+def chunk_ids_from_documents(docs: list[Document], chunks_per_video: int = CACHED_CHUNKS_PER_VIDEO) -> dict:
+    """Chunk IDs per video, in the same order and with the same cap as videos_from_documents."""
+    chunk_ids = {}
+    for doc in docs:
+        ids = chunk_ids.setdefault(doc.metadata.get('video_id', ''), [])
+        if len(ids) < chunks_per_video and doc.metadata.get('id'):
+            ids.append(doc.metadata['id'])
+    return chunk_ids
+
+
+def rank_video_chunks(db, topic: str, video_ids: list[str],
+                      chunks_per_video: int = CACHED_CHUNKS_PER_VIDEO) -> dict:
+    """Pick each video's chunks most relevant to topic, with its own k per video."""
+    query_vector = db.embeddings.embed_query(topic)
+    return chunk_ids_from_documents(
+        [
+            doc
+            for video_id in video_ids
+            for doc in db.similarity_search_by_vector(query_vector, k=chunks_per_video, filter={"video_id": video_id})
+        ],
+        chunks_per_video,
+    )
+
+
+def get_cached_videos(db, chunk_ids: dict[str, list[str]]) -> list[dict]:
+    from langchain.schema.document import Document
+
+    # Plain ID lookup of the chunks chosen when the topic was cached.
+    ordered_ids = [id_ for ids in chunk_ids.values() for id_ in ids]
+    items = db.get(ids=ordered_ids, include=["documents", "metadatas"])
+    found = {
+        id_: Document(page_content=text, metadata=metadata)
+        for id_, text, metadata in zip(items["ids"], items["documents"], items["metadatas"])
+    }
+    return videos_from_documents([found[id_] for id_ in ordered_ids if id_ in found])
+
+
+def format_timestamp(seconds) -> str:
+    minutes, seconds = divmod(int(seconds or 0), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
@@ -1,50 +1,76 @@
 from fastapi import FastAPI
 import os
 from dotenv import load_dotenv
-from groq import Groq
 import asyncio
-import uvicorn
 import json
-from yt_dlp import YoutubeDL
-from functools import reduce
-from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound, VideoUnavailable
-from googleapiclient.discovery import build
+from functools import lru_cache, reduce, partial
+from concurrent.futures import ThreadPoolExecutor
+from agent_loop import run_agent_loop
+from youtube_audio import transcribe_audio
+from youtube_index import (
+    TopicCache, add_videos_to_rag, chunk_ids_from_documents, get_cached_videos, rank_video_chunks,
+    videos_from_documents,
+)
 
 load_dotenv()
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
 app = FastAPI()
 
+# Blocking tool work (YouTube API, transcripts, yt-dlp, Whisper) runs here so it
+# never stalls the event loop. Bounded so concurrent requests share a fixed pool.
+TOOL_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("YT_TOOL_WORKERS", "4")), thread_name_prefix="yt-tool"
+)
+
+# Videos processed in parallel per search. Audio download / Whisper limits
+# live in youtube_audio.py.
+TRANSCRIPT_WORKERS = int(os.getenv("YT_TRANSCRIPT_WORKERS", "8"))
+
+TOPIC_CACHE = TopicCache()
+
+
+# Groq, googleapiclient and youtube_transcript_api are imported on first use
+# so the server (and anything importing this module) starts quickly.
+@lru_cache(maxsize=None)
+def get_client():
+    from groq import Groq
+    return Groq(api_key=os.getenv("GROQ_API_KEY"))
+
 
 def getYoutubeContent(topic):
     print("🚀 ~ topic ======>:", topic)
     
-    # Check if RAG system already has this topic
-    from langchain.vectorstores.chroma import Chroma
-    from get_embedding_function import get_embedding_function
+    from get_vector_store import YOUTUBE_COLLECTION, get_match_distance, get_vector_store
     
+    db = None
     try:
-        db = Chroma(persist_directory="chroma", embedding_function=get_embedding_function())
+        db = get_vector_store(YOUTUBE_COLLECTION)
+
+        # Topic seen recently: reload its chunks by ID, without searching
+        # YouTube or the vector index.
+        chunk_ids = TOPIC_CACHE.get(topic)
+        if chunk_ids:
+            cached_videos = get_cached_videos(db, chunk_ids)
+            if cached_videos:
+                print(f"✅ Topic cache hit, returning {len(cached_videos)} cached videos.")
+                return cached_videos
+
+        # Check if RAG system already has this topic
         results = db.similarity_search_with_score(topic, k=5)
         print(len(results),"result")
-        if results and results[0][1] < 0.7:  # Lower score means higher similarity
+        if results and results[0][1] < get_match_distance(db):  # Lower score means higher similarity
             print("✅ Found similar content in RAG system, returning cached result.")
-            cached_videos = []
-            for doc, score in results:
-                cached_videos.append({
-                        'title': doc.metadata.get('title', ''),
-                        'description': doc.metadata.get('description', ''),
-                        'transcript': doc.page_content,
-                        'video_id': doc.metadata.get('video_id', ''),
-                        'url': doc.metadata.get('url', ''),
-                        'thumbnail': doc.metadata.get('thumbnail', ''),
-                    })
+            docs = [doc for doc, _score in results]
+            cached_videos = videos_from_documents(docs)
             print(len(cached_videos),"cached_videos")
             if cached_videos:
+                TOPIC_CACHE.set(topic, chunk_ids_from_documents(docs))
                 return cached_videos
     except Exception as e:
         print(f"⚠️ Error checking RAG system: {e}")
     
     # If not found in RAG, proceed with YouTube search
+    from googleapiclient.discovery import build
+
     youtube = build('youtube', 'v3', developerKey=os.getenv("YOUTUBE_API_KEY"))
     search_response = youtube.search().list(
         q=topic,
@@ -53,104 +79,110 @@ def getYoutubeContent(topic):
         maxResults=2,
         order='relevance',
     ).execute()
-
-    videos = []
-    for search_result in search_response.get('items', []):
-        video_id = search_result['id']['videoId']
-        # Try fetching transcript
-        transcript_data = None
-        ytt_api = YouTubeTranscriptApi()
-        try:
-            transcript = ytt_api.list(video_id).find_transcript(['en'])
-            expected_transcript = transcript.fetch()
-            if hasattr(expected_transcript, "snippets"):
-                data = (" ".join(s.text.strip()
-                        for s in expected_transcript.snippets if s.text.strip()))
-                transcript_data = data
-
-        except (TranscriptsDisabled, NoTranscriptFound, VideoUnavailable):
-            # 1. Download audio
-            video_url = f"https://www.youtube.com/watch?v={video_id}"
-            ydl_opts = {
-                'format': 'bestaudio/best',
-                'outtmpl': f'{video_id}.%(ext)s',  # filename
-                'quiet': True,
-            }
-            with YoutubeDL(ydl_opts) as ydl:
-                ydl.download([video_url])
-
-            audio_file = f"./{video_id}.webm"
-            with open(audio_file, "rb") as f:
-                transcription = client.audio.transcriptions.create(
-                    file=f,  # Pass file object, not string
-                    model="whisper-large-v3-turbo",
-                    prompt="Specify context or spelling and response must be translate in English",  # Optional
-                    language="en",
-                    response_format="json",
-                    temperature=0.0
-                )
-            transcript_data = transcription.text
-
-            # Remove audio file after transcription
-            if os.path.exists(audio_file):
-                os.remove(audio_file)
-            print(f"⚠ 🚀 ~  No transcript available for 🚀 ~  {video_id}")
-        except Exception as e:
-            print(f"⚠ 🚀 ~  Error fetching transcript for 🚀 ~  {video_id}: {e}")
-            transcript_data = []
-            return "Error fetching transcript for video: " + str(e)
-
-        videos.append({
-            'title': search_result['snippet']['title'],
-            'description': search_result['snippet']['description'],
-            'transcript': transcript_data,
-            'video_id': video_id,
-            'url': f"https://www.youtube.com/watch?v={video_id}",
-            'thumbnail': search_result['snippet']['thumbnails']['default']['url'],
-        })
-
-        # Add to RAG system for future queries
+    search_results = search_response.get('items', [])
+
+    # Process all videos at once; latency is the slowest video, not the sum.
+    processed = []
+    if search_results:
+        with ThreadPoolExecutor(max_workers=min(TRANSCRIPT_WORKERS, len(search_results))) as pool:
+            processed = [result for result in pool.map(process_video, search_results) if result]
+    videos = [video for video, _segments in processed]
+
+    # Add to RAG system for future queries
+    if db is not None:
+        add_videos_to_rag(db, processed, topic)
         try:
-            from langchain.schema.document import Document
-            from langchain.vectorstores.chroma import Chroma
-            from get_embedding_function import get_embedding_function
-            
-            db = Chroma(persist_directory="chroma", embedding_function=get_embedding_function())
-            
-            # Create document with video content
-            doc = Document(
-                page_content=transcript_data,
-                metadata={
-                    "title": search_result['snippet']['title'],
-                    "description": search_result['snippet']['description'],
-                    "video_id": video_id,
-                    "url": f"https://www.youtube.com/watch?v={video_id}",
-                    "thumbnail": search_result['snippet']['thumbnails']['default']['url'],
-                    "source": "youtube",
-                    "topic": topic,
-                    "id": f"youtube:{video_id}:0"
-                }
-            )
-            
-            # Check if this video already exists in the database
-            existing_items = db.get(include=[])
-            existing_ids = set(existing_items["ids"])
-            
-            if doc.metadata["id"] not in existing_ids:
-                db.add_documents([doc], ids=[doc.metadata["id"]])
-                db.persist()
-                print(f"✅ Added video {video_id} to RAG system")
-            else:
-                print(f"📋 Video {video_id} already exists in RAG system")
-                
+            TOPIC_CACHE.set(topic, rank_video_chunks(db, topic, [video['video_id'] for video in videos]))
         except Exception as e:
-            print(f"⚠️ Error adding to RAG system: {e}")
+            print(f"⚠️ Error caching topic: {e}")
 
     # print("🚀 ~ videos ======>:", videos)
-    # print("transcript_data ==>:", transcript_data)
     return videos
 
 
+def process_video(search_result):
+    video_id = search_result['id']['videoId']
+    try:
+        segments = fetch_transcript(video_id)
+    except Exception as e:
+        print(f"⚠ 🚀 ~  Error fetching transcript for 🚀 ~  {video_id}: {e}")
+        return None
+    if not segments:
+        return None
+
+    video = {
+        'title': search_result['snippet']['title'],
+        'description': search_result['snippet']['description'],
+        'transcript': " ".join(segment['text'].strip() for segment in segments),
+        'video_id': video_id,
+        'url': f"https://www.youtube.com/watch?v={video_id}",
+        'thumbnail': search_result['snippet']['thumbnails']['default']['url'],
+    }
+    return video, segments
+
+
+def fetch_transcript(video_id):
+    """Timed transcript segments ({text, start, end}) for a video."""
+    from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound, VideoUnavailable
+
+    ytt_api = YouTubeTranscriptApi()
+    try:
+        transcript = ytt_api.list(video_id).find_transcript(['en'])
+        expected_transcript = transcript.fetch()
+        if hasattr(expected_transcript, "snippets"):
+            return [
+                {"text": s.text.strip(), "start": s.start, "end": s.start + s.duration}
+                for s in expected_transcript.snippets if s.text.strip()
+            ]
+        return None
+    except (TranscriptsDisabled, NoTranscriptFound, VideoUnavailable):
+        print(f"⚠ 🚀 ~  No transcript available for 🚀 ~  {video_id}")
+        return transcribe_audio(video_id)
+
+
+TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "getYoutubeContent",
+            "description": "Get the content of a YouTube video by topic. here you must be get transcript, title , description.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "topic": {
+                        "type": "string",
+                        "description": "The topic of the YouTube video that use for search on youtube and get content."
+                    },
+                },
+                "required": ["topic"]
+            }
+        }
+    },
+]
+
+
+def create_completion(messages, tool_choice):
+    # Tools stay declared even when tool_choice="none": the history holds
+    # tool calls, and the API rejects those without matching tool definitions.
+    return get_client().chat.completions.create(
+        messages=messages,
+        model="llama3-70b-8192",
+        tools=TOOLS,
+        tool_choice=tool_choice
+    )
+
+
+async def get_youtube_content_tool(topic):
+    # Runs on the bounded tool pool so it never blocks the event loop.
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(TOOL_EXECUTOR, partial(getYoutubeContent, topic=topic))
+    print(len(result),"result in getYoutubeContent")
+    return result
+
+
+TOOL_HANDLERS = {"getYoutubeContent": get_youtube_content_tool}
+
+
 @app.get("/youtube-content")
 async def youtube_content(prompt: str):
     messages = [
@@ -193,60 +225,21 @@ Do not include anything outside this array. Only evaluate the videos provided by
         "content": prompt
     })
 
-    while True:
-        completion = await asyncio.to_thread(lambda: client.chat.completions.create(
-            messages=messages,
-            model="llama3-70b-8192",
-            tools=[
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "getYoutubeContent",
-                        "description": "Get the content of a YouTube video by topic. here you must be get transcript, title , description.",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "topic": {
-                                    "type": "string",
-                                    "description": "The topic of the YouTube video that use for search on youtube and get content."
-                                },
-                            },
-                            "required": ["topic"]
-                        }
-                    }
-                },
-            ]
-        ))
-
-        messages.append(completion.choices[0].message)
-
-        tool_calls = completion.choices[0].message.tool_calls
-
-        # Exit loop if no tool call
-        if not tool_calls:
-            break
-
-        for tool in tool_calls:
-            function_name = tool.function.name
-            function_args = json.loads(tool.function.arguments)
-
-            if function_name == "getYoutubeContent":
-                result = getYoutubeContent(
-                    topic=function_args["topic"]
-                )
-                print(len(result),"result in getYoutubeContent")
-            # Append tool output for next AI step
-            messages.append({
-                "role": "tool",
-                "tool_call_id": tool.id,
-                "content": json.dumps(result)
-            })
-          
+    # Bounded loop: capped round trips, repeated topics deduplicated and
+    # tool results trimmed to a token budget before going back to the model.
+    final_message = await run_agent_loop(create_completion, messages, TOOL_HANDLERS)
+
     # print("🚀 ~ messages ======>:", messages)
-    parsed_content = json.loads(messages[-1].content)
+    if final_message.content is None:
+        # The model still answered with tool calls only; nothing to parse.
+        print("⚠️ Final message has no content, returning no videos")
+        return {"assistant": []}
+    parsed_content = json.loads(final_message.content)
     # print("🚀 ~ messages ======>:", parsed_content)
     return {"assistant": parsed_content}
 
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run(app, host="127.0.0.1", port=8000, reload=True)
\ No newline at end of file